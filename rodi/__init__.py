@@ -1,24 +1,30 @@
 import inspect
 import re
 import sys
-from collections import defaultdict
+from collections import OrderedDict
 from enum import Enum
-from inspect import Signature, _empty, isabstract, isclass, iscoroutinefunction
+from functools import lru_cache
+from inspect import Signature, _empty, isabstract, iscoroutinefunction
+from keyword import iskeyword
+from types import FunctionType
 from typing import (
     Any,
     Callable,
     ClassVar,
-    DefaultDict,
     Dict,
+    FrozenSet,
+    Iterable,
     Mapping,
     Optional,
     Set,
+    Tuple,
     Type,
     TypeVar,
     Union,
     cast,
     get_type_hints,
 )
+from weakref import WeakKeyDictionary, WeakValueDictionary
 
 if sys.version_info >= (3, 8):  # pragma: no cover
     try:
@@ -31,9 +37,20 @@ try:
 except ImportError:  # pragma: no cover
     from typing_extensions import Protocol
 
+try:
+    from types import GenericAlias as _GenericAlias
+except ImportError:  # pragma: no cover
+    # Python < 3.9, builtin generics cannot be parametrized
+    _GenericAlias = ()  # type: ignore
+
+# on Python 3.10+, annotations are evaluated with typing.get_type_hints
+_PY310 = sys.version_info >= (3, 10)
+
 
 T = TypeVar("T")
 
+_MISSING = object()
+
 
 class ContainerProtocol(Protocol):
     """
@@ -61,14 +78,19 @@ def inject(globalsns=None, localns=None) -> Callable[..., Any]:
     Marks a class or a function as injected. This method is only necessary if the class
     uses locals and the user uses Python >= 3.10, to bind the function's locals to the
     factory.
+
+    When both namespaces are given explicitly, the frame of the caller is not
+    inspected, which avoids materializing its locals for decorators applied inside
+    functions. At module scope the caller's locals are its globals.
     """
     if localns is None or globalsns is None:
-        frame = inspect.currentframe()
+        # the frame of the caller
+        frame = sys._getframe(1)
         try:
             if localns is None:
-                localns = frame.f_back.f_locals  # type: ignore
+                localns = frame.f_locals
             if globalsns is None:
-                globalsns = frame.f_back.f_globals  # type: ignore
+                globalsns = frame.f_globals
         finally:
             del frame
 
@@ -85,9 +107,9 @@ def _get_obj_locals(obj) -> Optional[Dict[str, Any]]:
 
 
 def class_name(input_type):
-    if input_type in {list, set} and str(  # noqa: E721
-        type(input_type) == "<class 'types.GenericAlias'>"
-    ):
+    if isinstance(input_type, str):
+        return input_type
+    if isinstance(input_type, _GenericAlias):
         # for Python 3.9 list[T], set[T]
         return str(input_type)
     try:
@@ -100,8 +122,12 @@ def class_name(input_type):
 class DIException(Exception):
     """Base exception class for DI exceptions."""
 
+    __slots__ = ()
+
 
 class FactoryMissingContextException(DIException):
+    __slots__ = ()
+
     def __init__(self, function) -> None:
         super().__init__(
             f"The factory '{function.__name__}' lacks locals and globals data. "
@@ -114,6 +140,8 @@ class CannotResolveTypeException(DIException):
     """
     Exception risen when it is not possible to resolve a Type."""
 
+    __slots__ = ()
+
     def __init__(self, desired_type):
         super().__init__(f"Unable to resolve the type '{desired_type}'.")
 
@@ -123,8 +151,14 @@ class CannotResolveParameterException(DIException):
     Exception risen when it is not possible to resolve a parameter,
     necessary to instantiate a type."""
 
+    __slots__ = ()
+
     def __init__(self, param_name, desired_type):
-        super().__init__(
+        super().__init__(param_name, desired_type)
+
+    def __str__(self):
+        param_name, desired_type = self.args
+        return (
             f"Unable to resolve parameter '{param_name}' "
             f"when resolving '{class_name(desired_type)}'"
         )
@@ -134,8 +168,14 @@ class UnsupportedUnionTypeException(DIException):
     """Exception risen when a parameter type is defined
     as Optional or Union of several types."""
 
+    __slots__ = ()
+
     def __init__(self, param_name, desired_type):
-        super().__init__(
+        super().__init__(param_name, desired_type)
+
+    def __str__(self):
+        param_name, desired_type = self.args
+        return (
             f"Union or Optional type declaration is not supported. "
             f"Cannot resolve parameter '{param_name}' "
             f"when resolving '{class_name(desired_type)}'"
@@ -147,10 +187,15 @@ class OverridingServiceException(DIException):
     Exception risen when registering a service
     would override an existing one."""
 
+    __slots__ = ()
+
     def __init__(self, key, value):
-        key_name = key if isinstance(key, str) else class_name(key)
-        super().__init__(
-            f"A service with key '{key_name}' is already "
+        super().__init__(key, value)
+
+    def __str__(self):
+        key, value = self.args
+        return (
+            f"A service with key '{class_name(key)}' is already "
             f"registered and would be overridden by value {value}."
         )
 
@@ -159,8 +204,14 @@ class CircularDependencyException(DIException):
     """Exception risen when a circular dependency between a type and
     one of its parameters is detected."""
 
+    __slots__ = ()
+
     def __init__(self, expected_type, desired_type):
-        super().__init__(
+        super().__init__(expected_type, desired_type)
+
+    def __str__(self):
+        expected_type, desired_type = self.args
+        return (
             "A circular dependency was detected for the service "
             f"of type '{class_name(expected_type)}' "
             f"for '{class_name(desired_type)}'"
@@ -168,6 +219,8 @@ class CircularDependencyException(DIException):
 
 
 class InvalidOperationInStrictMode(DIException):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(
             "The services are configured in strict mode, the operation is invalid."
@@ -177,6 +230,8 @@ class InvalidOperationInStrictMode(DIException):
 class AliasAlreadyDefined(DIException):
     """Exception risen when trying to add an alias that already exists."""
 
+    __slots__ = ()
+
     def __init__(self, name):
         super().__init__(
             f"Cannot define alias '{name}'. "
@@ -185,8 +240,14 @@ class AliasAlreadyDefined(DIException):
 
 
 class AliasConfigurationError(DIException):
+    __slots__ = ()
+
     def __init__(self, name, _type):
-        super().__init__(
+        super().__init__(name, _type)
+
+    def __str__(self):
+        name, _type = self.args
+        return (
             f"An alias '{name}' for type '{class_name(_type)}' was defined, "
             f"but the type was not configured in the Container."
         )
@@ -195,6 +256,8 @@ class AliasConfigurationError(DIException):
 class MissingTypeException(DIException):
     """Exception risen when a type must be specified to use a factory"""
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(
             "Please specify the factory return type or "
@@ -205,6 +268,8 @@ class MissingTypeException(DIException):
 class InvalidFactory(DIException):
     """Exception risen when a factory is not valid"""
 
+    __slots__ = ()
+
     def __init__(self, _type):
         super().__init__(
             f"The factory specified for type {class_name(_type)} is not "
@@ -223,14 +288,106 @@ class ServiceLifeStyle(Enum):
     SINGLETON = 3
 
 
+_factory_annotations: "WeakKeyDictionary[Callable, Dict[str, Any]]" = (
+    WeakKeyDictionary()
+)
+
+
 def _get_factory_annotations_or_throw(factory):
+    # bound methods are created on each access, their functions are cached instead
+    key = getattr(factory, "__func__", factory)
+    try:
+        return _factory_annotations[key]
+    except (KeyError, TypeError):
+        pass
+
     factory_locals = getattr(factory, "_locals", None)
     factory_globals = getattr(factory, "_globals", None)
 
     if factory_locals is None:
         raise FactoryMissingContextException(factory)
 
-    return get_type_hints(factory, globalns=factory_globals, localns=factory_locals)
+    if isinstance(key, FunctionType) and _has_plain_annotations(key):
+        annotations = dict(key.__annotations__)
+    else:
+        annotations = get_type_hints(
+            factory, globalns=factory_globals, localns=factory_locals
+        )
+    try:
+        _factory_annotations[key] = annotations
+    except TypeError:
+        # the factory does not support weak references
+        pass
+    return annotations
+
+
+def _has_plain_annotations(function: FunctionType) -> bool:
+    """
+    Returns a value indicating whether the annotations of a function are all classes,
+    in which case they do not need to be evaluated with get_type_hints.
+    """
+    defaults = function.__defaults__ or ()
+    kwdefaults = function.__kwdefaults__ or {}
+    if any(value is None for value in defaults) or any(
+        value is None for value in kwdefaults.values()
+    ):
+        # before Python 3.11, get_type_hints makes these parameters Optional
+        return False
+    return all(_is_plain_class(value) for value in function.__annotations__.values())
+
+
+_CO_VARIADIC = inspect.CO_VARARGS | inspect.CO_VARKEYWORDS
+
+
+def _is_plain_function(fn) -> bool:
+    """
+    Returns a value indicating whether a callable is a plain function with only
+    positional or keyword parameters, whose signature can be read from its code
+    object instead of creating an inspect.Signature.
+    """
+    if (
+        not isinstance(fn, FunctionType)
+        or hasattr(fn, "__wrapped__")
+        or hasattr(fn, "__signature__")
+    ):
+        return False
+    code = fn.__code__
+    return not code.co_flags & _CO_VARIADIC and not code.co_kwonlyargcount
+
+
+def _get_factory_signature(factory) -> Tuple[int, Any]:
+    """
+    Returns the number of parameters and the return annotation of a factory.
+    For plain functions these are read from the code object, which is much cheaper
+    than creating an inspect.Signature.
+    """
+    if _is_plain_function(factory):
+        return (
+            factory.__code__.co_argcount,
+            factory.__annotations__.get("return", _empty),
+        )
+
+    sign = Signature.from_callable(factory)
+    return len(sign.parameters), sign.return_annotation
+
+
+def _get_parameters_annotations(method) -> Dict[str, Any]:
+    """
+    Returns the annotations of the parameters of a callable, by parameter name.
+    For plain functions these are read from the code object, like for factories.
+    """
+    if _is_plain_function(method):
+        code = method.__code__
+        annotations = method.__annotations__
+        return {
+            name: annotations.get(name, _empty)
+            for name in code.co_varnames[: code.co_argcount]
+        }
+
+    return {
+        key: value.annotation
+        for key, value in Signature.from_callable(method).parameters.items()
+    }
 
 
 class ActivationScope:
@@ -272,7 +429,6 @@ class ActivationScope:
 
 class ResolutionContext:
     __slots__ = ("resolved", "dynamic_chain")
-    __deletable__ = ("resolved",)
 
     def __init__(self):
         self.resolved = {}
@@ -285,7 +441,7 @@ class ResolutionContext:
         self.dispose()
 
     def dispose(self):
-        del self.resolved
+        self.resolved.clear()
         self.dynamic_chain.clear()
 
 
@@ -299,42 +455,114 @@ class InstanceProvider:
         return self.instance
 
 
-class TypeProvider:
-    __slots__ = ("_type",)
+class _SharedTypeProvider:
+    """
+    Base class for stateless providers that only hold a type, shared with other
+    services maps. Each subclass keeps its own instances by type.
+    """
+
+    __slots__ = ("_type", "__weakref__")
+
+    _instances: "WeakValueDictionary[Type, _SharedTypeProvider]"
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._instances = WeakValueDictionary()
 
     def __init__(self, _type):
         self._type = _type
 
+    @classmethod
+    def get(cls, _type):
+        """
+        Returns a provider for the given type, shared with other services maps, since
+        providers of this kind are stateless.
+        """
+        provider = cls._instances.get(_type)
+        if provider is None:
+            provider = cls(_type)
+            cls._instances[_type] = provider
+        return provider
+
+
+class TypeProvider(_SharedTypeProvider):
+    __slots__ = ()
+
     def __call__(self, context, parent_type):
         return self._type()
 
 
-class ScopedTypeProvider:
-    __slots__ = ("_type",)
-
-    def __init__(self, _type):
-        self._type = _type
+class ScopedTypeProvider(_SharedTypeProvider):
+    __slots__ = ()
 
     def __call__(self, context: ActivationScope, parent_type):
-        if self._type in context.scoped_services:
-            return context.scoped_services[self._type]
-
-        service = self._type()
-        context.scoped_services[self._type] = service
+        scoped_services = context.scoped_services
+        _type = self._type
+        service = scoped_services.get(_type, _MISSING)
+        if service is _MISSING:
+            service = _type()
+            scoped_services[_type] = service
         return service
 
 
+# maximum number of constructor arguments for which providers use a specialized
+# __call__, passing the arguments without building intermediate lists
+_MAX_UNROLLED_ARGS = 4
+
+
+def _compile_provider_call(template: str, arity: int) -> Callable:
+    """
+    Compiles the source of a provider's __call__ for a fixed number of arguments
+    callbacks, unpacked from self._args_callbacks as f0, f1, ..., fn.
+    """
+    names = ", ".join(f"f{i}" for i in range(arity))
+    source = template.format(
+        unpack=f"{names}, = self._args_callbacks" if arity else "",
+        args=", ".join(f"f{i}(context, _type)" for i in range(arity)),
+    )
+    namespace: Dict[str, Any] = {}
+    exec(source, {"_MISSING": _MISSING}, namespace)
+    return namespace["__call__"]
+
+
 class ArgsTypeProvider:
     __slots__ = ("_type", "_args_callbacks")
 
     def __init__(self, _type, args_callbacks):
         self._type = _type
-        self._args_callbacks = args_callbacks
+        self._args_callbacks = tuple(args_callbacks)
 
     def __call__(self, context, parent_type):
         return self._type(*[fn(context, self._type) for fn in self._args_callbacks])
 
 
+_ARGS_TYPE_PROVIDER_CALL = """
+def __call__(self, context, parent_type):
+    _type = self._type
+    {unpack}
+    return _type({args})
+"""
+
+_UNROLLED_ARGS_TYPE_PROVIDERS = tuple(
+    type(
+        f"ArgsTypeProvider{arity}",
+        (ArgsTypeProvider,),
+        {
+            "__slots__": (),
+            "__call__": _compile_provider_call(_ARGS_TYPE_PROVIDER_CALL, arity),
+        },
+    )
+    for arity in range(_MAX_UNROLLED_ARGS + 1)
+)
+
+
+def _get_args_type_provider(_type, args_callbacks) -> ArgsTypeProvider:
+    args_callbacks = tuple(args_callbacks)
+    if len(args_callbacks) <= _MAX_UNROLLED_ARGS:
+        return _UNROLLED_ARGS_TYPE_PROVIDERS[len(args_callbacks)](_type, args_callbacks)
+    return ArgsTypeProvider(_type, args_callbacks)
+
+
 class FactoryTypeProvider:
     __slots__ = ("_type", "factory")
 
@@ -343,7 +571,6 @@ class FactoryTypeProvider:
         self.factory = factory
 
     def __call__(self, context: ActivationScope, parent_type):
-        assert isinstance(context, ActivationScope)
         return self.factory(context, parent_type)
 
 
@@ -356,8 +583,22 @@ class SingletonFactoryTypeProvider:
         self.instance = None
 
     def __call__(self, context: ActivationScope, parent_type):
-        if self.instance is None:
-            self.instance = self.factory(context, parent_type)
+        if type(self) is not SingletonFactoryTypeProvider:
+            # subclasses may have a different layout and cannot switch class
+            if self.instance is None:
+                self.instance = self.factory(context, parent_type)
+            return self.instance
+
+        self.instance = self.factory(context, parent_type)
+        # from now on, the provider returns the instance without further checks
+        self.__class__ = _ActivatedSingletonFactoryTypeProvider
+        return self.instance
+
+
+class _ActivatedSingletonFactoryTypeProvider(SingletonFactoryTypeProvider):
+    __slots__ = ()
+
+    def __call__(self, context: ActivationScope, parent_type):
         return self.instance
 
 
@@ -369,11 +610,12 @@ class ScopedFactoryTypeProvider:
         self.factory = factory
 
     def __call__(self, context: ActivationScope, parent_type):
-        if self._type in context.scoped_services:
-            return context.scoped_services[self._type]
-
-        instance = self.factory(context, parent_type)
-        context.scoped_services[self._type] = instance
+        scoped_services = context.scoped_services
+        _type = self._type
+        instance = scoped_services.get(_type, _MISSING)
+        if instance is _MISSING:
+            instance = self.factory(context, parent_type)
+            scoped_services[_type] = instance
         return instance
 
 
@@ -382,56 +624,168 @@ class ScopedArgsTypeProvider:
 
     def __init__(self, _type, args_callbacks):
         self._type = _type
-        self._args_callbacks = args_callbacks
+        self._args_callbacks = tuple(args_callbacks)
 
     def __call__(self, context: ActivationScope, parent_type):
-        if self._type in context.scoped_services:
-            return context.scoped_services[self._type]
-
-        service = self._type(*[fn(context, self._type) for fn in self._args_callbacks])
-        context.scoped_services[self._type] = service
+        scoped_services = context.scoped_services
+        _type = self._type
+        service = scoped_services.get(_type, _MISSING)
+        if service is _MISSING:
+            service = _type(*[fn(context, _type) for fn in self._args_callbacks])
+            scoped_services[_type] = service
         return service
 
 
+_SCOPED_ARGS_TYPE_PROVIDER_CALL = """
+def __call__(self, context, parent_type):
+    scoped_services = context.scoped_services
+    _type = self._type
+    service = scoped_services.get(_type, _MISSING)
+    if service is _MISSING:
+        {unpack}
+        service = _type({args})
+        scoped_services[_type] = service
+    return service
+"""
+
+_UNROLLED_SCOPED_ARGS_TYPE_PROVIDERS = tuple(
+    type(
+        f"ScopedArgsTypeProvider{arity}",
+        (ScopedArgsTypeProvider,),
+        {
+            "__slots__": (),
+            "__call__": _compile_provider_call(_SCOPED_ARGS_TYPE_PROVIDER_CALL, arity),
+        },
+    )
+    for arity in range(_MAX_UNROLLED_ARGS + 1)
+)
+
+
+def _get_scoped_args_type_provider(_type, args_callbacks) -> ScopedArgsTypeProvider:
+    args_callbacks = tuple(args_callbacks)
+    if len(args_callbacks) <= _MAX_UNROLLED_ARGS:
+        return _UNROLLED_SCOPED_ARGS_TYPE_PROVIDERS[len(args_callbacks)](
+            _type, args_callbacks
+        )
+    return ScopedArgsTypeProvider(_type, args_callbacks)
+
+
 class SingletonTypeProvider:
     __slots__ = ("_type", "_instance", "_args_callbacks")
 
-    def __init__(self, _type, _args_callbacks):
+    def __init__(self, _type, _args_callbacks=None):
         self._type = _type
         self._args_callbacks = _args_callbacks
         self._instance = None
 
     def __call__(self, context, parent_type):
-        if self._instance is None:
-            self._instance = (
-                self._type(*[fn(context, self._type) for fn in self._args_callbacks])
-                if self._args_callbacks
-                else self._type()
-            )
+        if type(self) is not SingletonTypeProvider:
+            # subclasses may have a different layout and cannot switch class
+            if self._instance is None:
+                self._instance = self._activate(context)
+            return self._instance
+
+        self._instance = self._activate(context)
+        # from now on, the provider returns the instance without further checks
+        self.__class__ = _ActivatedSingletonTypeProvider
+        return self._instance
+
+    def _activate(self, context):
+        return (
+            self._type(*[fn(context, self._type) for fn in self._args_callbacks])
+            if self._args_callbacks
+            else self._type()
+        )
+
 
+class _ActivatedSingletonTypeProvider(SingletonTypeProvider):
+    __slots__ = ()
+
+    def __call__(self, context, parent_type):
         return self._instance
 
 
+# singleton providers that already created their instance
+_ACTIVATED_SINGLETON_PROVIDERS = (
+    _ActivatedSingletonTypeProvider,
+    _ActivatedSingletonFactoryTypeProvider,
+)
+
+# providers by life style, for types activated without arguments
+_TYPE_PROVIDERS: Dict[ServiceLifeStyle, Callable] = {
+    ServiceLifeStyle.TRANSIENT: TypeProvider.get,
+    ServiceLifeStyle.SCOPED: ScopedTypeProvider.get,
+    ServiceLifeStyle.SINGLETON: SingletonTypeProvider,
+}
+
+# providers by life style, for types activated with arguments
+_ARGS_TYPE_PROVIDERS: Dict[ServiceLifeStyle, Callable] = {
+    ServiceLifeStyle.TRANSIENT: _get_args_type_provider,
+    ServiceLifeStyle.SCOPED: _get_scoped_args_type_provider,
+    ServiceLifeStyle.SINGLETON: SingletonTypeProvider,
+}
+
+# providers by life style, for types activated by factories
+_FACTORY_TYPE_PROVIDERS: Dict[ServiceLifeStyle, Callable] = {
+    ServiceLifeStyle.TRANSIENT: FactoryTypeProvider,
+    ServiceLifeStyle.SCOPED: ScopedFactoryTypeProvider,
+    ServiceLifeStyle.SINGLETON: SingletonFactoryTypeProvider,
+}
+
+
 def get_annotations_type_provider(
     concrete_type: Type,
     resolvers: Mapping[str, Callable],
     life_style: ServiceLifeStyle,
     resolver_context: ResolutionContext,
 ):
-    def factory(context, parent_type):
-        instance = concrete_type()
-        for name, resolver in resolvers.items():
-            setattr(instance, name, resolver(context, parent_type))
-        return instance
+    names = tuple(resolvers.keys())
+
+    if all(name.isidentifier() and not iskeyword(name) for name in names):
+        factory = _compile_annotations_factory(names)(
+            concrete_type, tuple(resolvers.values())
+        )
+    else:
+
+        def factory(context, parent_type):
+            instance = concrete_type()
+            for name, resolver in resolvers.items():
+                setattr(instance, name, resolver(context, parent_type))
+            return instance
 
     return FactoryResolver(concrete_type, factory, life_style)(resolver_context)
 
 
-def _get_plain_class_factory(concrete_type: Type):
-    def factory(*args):
-        return concrete_type()
+_ANNOTATIONS_FACTORY = """
+def make_factory(concrete_type, resolvers):
+    {unpack}
+
+    def factory(context, parent_type):
+        instance = concrete_type()
+        {assignments}
+        return instance
 
     return factory
+"""
+
+
+@lru_cache(maxsize=1024)
+def _compile_annotations_factory(names: Tuple[str, ...]) -> Callable:
+    """
+    Compiles a function that returns factories setting the given attributes on
+    new instances, using one resolver for each attribute.
+    """
+    resolvers = ", ".join(f"r{i}" for i in range(len(names)))
+    source = _ANNOTATIONS_FACTORY.format(
+        unpack=f"{resolvers}, = resolvers" if names else "",
+        assignments="\n        ".join(
+            f"instance.{name} = r{i}(context, parent_type)"
+            for i, name in enumerate(names)
+        ),
+    )
+    namespace: Dict[str, Any] = {}
+    exec(source, {}, namespace)
+    return namespace["make_factory"]
 
 
 class InstanceResolver:
@@ -455,11 +809,79 @@ class Dependency:
         self.annotation = annotation
 
 
+# names of parameters that are never resolved as dependencies
+_IGNORED_PARAMETERS = frozenset({"self", "args", "kwargs"})
+
+
+def _is_plain_class(value) -> bool:
+    return isinstance(value, type) and not isinstance(value, _GenericAlias)
+
+
+_init_dependencies: "WeakKeyDictionary[Type, Dict[str, Any]]" = WeakKeyDictionary()
+_class_annotations: "WeakKeyDictionary[Type, Dict[str, Any]]" = WeakKeyDictionary()
+
+
+def _get_init_dependencies(concrete_type: Type) -> Dict[str, Any]:
+    """
+    Returns the annotations of the parameters of the __init__ method of a type,
+    inspected once per type since the same types are resolved by many service
+    providers.
+    """
+    try:
+        return _init_dependencies[concrete_type]
+    except KeyError:
+        pass
+
+    sig = Signature.from_callable(concrete_type.__init__)
+    params = {
+        key: value.annotation
+        for key, value in sig.parameters.items()
+        if key not in _IGNORED_PARAMETERS
+    }
+
+    # type hints only need to be evaluated if some annotations are not classes,
+    # like forward references, or if they would be made implicitly Optional
+    if _PY310 and not all(
+        _is_plain_class(value.annotation) and value.default is not None
+        for value in sig.parameters.values()
+    ):  # pragma: no cover
+        # Python 3.10
+        annotations = get_type_hints(
+            concrete_type.__init__,
+            vars(sys.modules[concrete_type.__module__]),
+            _get_obj_locals(concrete_type),
+        )
+        for key in params:
+            if key in annotations:
+                params[key] = annotations[key]
+
+    _init_dependencies[concrete_type] = params
+    return params
+
+
+def _get_class_annotations(concrete_type: Type) -> Dict[str, Any]:
+    """
+    Returns the type hints of a class, evaluated once per type.
+    """
+    try:
+        return _class_annotations[concrete_type]
+    except KeyError:
+        pass
+
+    annotations = get_type_hints(
+        concrete_type,
+        vars(sys.modules[concrete_type.__module__]),
+        _get_obj_locals(concrete_type),
+    )
+    _class_annotations[concrete_type] = annotations
+    return annotations
+
+
 class DynamicResolver:
     __slots__ = ("_concrete_type", "services", "life_style")
 
     def __init__(self, concrete_type, services, life_style):
-        assert isclass(concrete_type)
+        assert isinstance(concrete_type, type)
         assert not isabstract(concrete_type)
 
         self._concrete_type = concrete_type
@@ -470,56 +892,38 @@ class DynamicResolver:
     def concrete_type(self) -> Type:
         return self._concrete_type
 
-    def _get_resolver(self, desired_type, context: ResolutionContext):
-        # NB: the following two lines are important to ensure that singletons
-        # are instantiated only once per service provider
-        # to not repeat operations more than once
-        if desired_type in context.resolved:
-            return context.resolved[desired_type]
-
-        reg = self.services._map.get(desired_type)
-        assert (
-            reg is not None
-        ), f"A resolver for type {class_name(desired_type)} is not configured"
-        resolver = reg(context)
-
-        # add the resolver to the context, so we can find it
-        # next time we need it
-        context.resolved[desired_type] = resolver
-        return resolver
-
     def _get_resolvers_for_parameters(
         self,
         concrete_type,
         context: ResolutionContext,
-        params: Mapping[str, Dependency],
+        params: Mapping[str, Any],
     ):
         fns = []
         services = self.services
-
-        for param_name, param in params.items():
-            if param_name in ("self", "args", "kwargs"):
-                continue
-
-            param_type = param.annotation
-
-            if hasattr(param_type, "__origin__") and param_type.__origin__ is Union:
+        strict = services.strict
+        registrations = services._map
+        exact_aliases = services._exact_aliases
+        inferred_aliases = services._aliases
+        resolved = context.resolved
+
+        for param_name, param_type in params.items():
+            if getattr(param_type, "__origin__", None) is Union:
                 # NB: we could cycle through possible types using: param_type.__args__
                 # Right now Union and Optional types resolution is not implemented,
                 # but at least Optional could be supported in the future
                 raise UnsupportedUnionTypeException(param_name, concrete_type)
 
             if param_type is _empty:
-                if services.strict:
+                if strict:
                     raise CannotResolveParameterException(param_name, concrete_type)
 
                 # support for exact, user defined aliases, without ambiguity
-                exact_alias = services._exact_aliases.get(param_name)
+                exact_alias = exact_aliases.get(param_name)
 
-                if exact_alias:
+                if exact_alias is not None:
                     param_type = exact_alias
                 else:
-                    aliases = services._aliases[param_name]
+                    aliases = inferred_aliases.get(param_name)
 
                     if aliases:
                         assert (
@@ -528,51 +932,32 @@ class DynamicResolver:
                         for param_type in aliases:
                             break
 
-            if param_type not in services._map:
-                raise CannotResolveParameterException(param_name, concrete_type)
+            # NB: resolvers are reused through the context, to ensure that singletons
+            # are instantiated only once per service provider
+            param_resolver = resolved.get(param_type, _MISSING)
+
+            if param_resolver is _MISSING:
+                reg = registrations.get(param_type)
+                if reg is None:
+                    raise CannotResolveParameterException(param_name, concrete_type)
+
+                param_resolver = reg(context)
+                resolved[param_type] = param_resolver
 
-            param_resolver = self._get_resolver(param_type, context)
             fns.append(param_resolver)
         return fns
 
     def _resolve_by_init_method(self, context: ResolutionContext):
-        sig = Signature.from_callable(self.concrete_type.__init__)
-        params = {
-            key: Dependency(key, value.annotation)
-            for key, value in sig.parameters.items()
-        }
-
-        if sys.version_info >= (3, 10):  # pragma: no cover
-            # Python 3.10
-            annotations = get_type_hints(
-                self.concrete_type.__init__,
-                vars(sys.modules[self.concrete_type.__module__]),
-                _get_obj_locals(self.concrete_type),
-            )
-            for key, value in params.items():
-                if key in annotations:
-                    value.annotation = annotations[key]
-
         concrete_type = self.concrete_type
+        params = _get_init_dependencies(concrete_type)
 
-        if len(params) == 1 and next(iter(params.keys())) == "self":
-            if self.life_style == ServiceLifeStyle.SINGLETON:
-                return SingletonTypeProvider(concrete_type, None)
-
-            if self.life_style == ServiceLifeStyle.SCOPED:
-                return ScopedTypeProvider(concrete_type)
-
-            return TypeProvider(concrete_type)
+        if not params:
+            # the type is activated without arguments
+            return _TYPE_PROVIDERS[self.life_style](concrete_type)
 
         fns = self._get_resolvers_for_parameters(concrete_type, context, params)
 
-        if self.life_style == ServiceLifeStyle.SINGLETON:
-            return SingletonTypeProvider(concrete_type, fns)
-
-        if self.life_style == ServiceLifeStyle.SCOPED:
-            return ScopedArgsTypeProvider(concrete_type, fns)
-
-        return ArgsTypeProvider(concrete_type, fns)
+        return _ARGS_TYPE_PROVIDERS[self.life_style](concrete_type, fns)
 
     def _ignore_class_attribute(self, key: str, value) -> bool:
         """
@@ -600,17 +985,15 @@ class DynamicResolver:
         self, context: ResolutionContext, annotations: Dict[str, Type]
     ):
         params = {
-            key: Dependency(key, value)
+            key: value
             for key, value in annotations.items()
-            if not self._ignore_class_attribute(key, value)
+            if key not in _IGNORED_PARAMETERS
+            and not self._ignore_class_attribute(key, value)
         }
         concrete_type = self.concrete_type
 
         fns = self._get_resolvers_for_parameters(concrete_type, context, params)
-        resolvers = {}
-
-        for i, name in enumerate(params.keys()):
-            resolvers[name] = fns[i]
+        resolvers = dict(zip(params.keys(), fns))
 
         return get_annotations_type_provider(
             self.concrete_type, resolvers, self.life_style, context
@@ -623,11 +1006,7 @@ class DynamicResolver:
         chain.append(concrete_type)
 
         if self._has_default_init():
-            annotations = get_type_hints(
-                concrete_type,
-                vars(sys.modules[concrete_type.__module__]),
-                _get_obj_locals(concrete_type),
-            )
+            annotations = _get_class_annotations(concrete_type)
 
             if annotations:
                 try:
@@ -635,9 +1014,8 @@ class DynamicResolver:
                 except RecursionError:
                     raise CircularDependencyException(chain[0], concrete_type)
 
-            return FactoryResolver(
-                concrete_type, _get_plain_class_factory(concrete_type), self.life_style
-            )(context)
+            # the type is activated without arguments
+            return _TYPE_PROVIDERS[self.life_style](concrete_type)
 
         try:
             return self._resolve_by_init_method(context)
@@ -646,32 +1024,62 @@ class DynamicResolver:
 
 
 class FactoryResolver:
-    __slots__ = ("concrete_type", "factory", "params", "life_style")
+    __slots__ = ("concrete_type", "factory", "params", "life_style", "_make")
 
     def __init__(self, concrete_type, factory, life_style):
         self.factory = factory
         self.concrete_type = concrete_type
         self.life_style = life_style
+        self._make = _FACTORY_TYPE_PROVIDERS[life_style]
 
     def __call__(self, context: ResolutionContext):
-        if self.life_style == ServiceLifeStyle.SINGLETON:
-            return SingletonFactoryTypeProvider(self.concrete_type, self.factory)
-
-        if self.life_style == ServiceLifeStyle.SCOPED:
-            return ScopedFactoryTypeProvider(self.concrete_type, self.factory)
-
-        return FactoryTypeProvider(self.concrete_type, self.factory)
+        return self._make(self.concrete_type, self.factory)
 
 
 first_cap_re = re.compile("(.)([A-Z][a-z]+)")
 all_cap_re = re.compile("([a-z0-9])([A-Z])")
 
 
+@lru_cache(maxsize=2048)
 def to_standard_param_name(name):
     value = all_cap_re.sub(r"\1_\2", first_cap_re.sub(r"\1_\2", name)).lower()
     if value.startswith("i_"):
-        return "i" + value[2:]
-    return value
+        value = "i" + value[2:]
+    # parameter names read from code objects are interned, aliases are interned too
+    # so that they can be matched by identity
+    return sys.intern(value)
+
+
+_inferred_aliases: "WeakKeyDictionary[Any, FrozenSet[str]]" = WeakKeyDictionary()
+
+
+def _get_inferred_aliases(key, key_name: str) -> FrozenSet[str]:
+    """
+    Returns the names by which a registered type can be resolved, computed once per
+    type since the same types are often registered in several containers.
+    """
+    try:
+        return _inferred_aliases[key]
+    except (KeyError, TypeError):
+        pass
+
+    aliases = frozenset(
+        map(
+            sys.intern,
+            (key_name, key_name.lower(), to_standard_param_name(key_name)),
+        )
+    )
+    try:
+        _inferred_aliases[key] = aliases
+    except TypeError:
+        # the key does not support weak references
+        pass
+    return aliases
+
+
+# maximum number of executors cached by a service provider, to not retain
+# methods created dynamically
+_MAX_EXECUTORS = 1024
 
 
 class Services:
@@ -679,13 +1087,20 @@ class Services:
     Provides methods to activate instances of classes, by cached activator functions.
     """
 
-    __slots__ = ("_map", "_executors")
+    __slots__ = ("_map", "_executors", "_singletons", "_getters")
 
     def __init__(self, services_map=None):
         if services_map is None:
             services_map = {}
         self._map = services_map
-        self._executors = {}
+        self._executors: "OrderedDict[Callable, Callable]" = OrderedDict()
+        # registered instances, returned directly when no scope is given
+        self._singletons: Dict[Union[Type, str], Any] = {
+            key: provider.instance
+            for key, provider in services_map.items()
+            if type(provider) is InstanceProvider
+        }
+        self._getters: Dict[Any, Callable] = {}
 
     def __contains__(self, item):
         return item in self._map
@@ -705,18 +1120,22 @@ class Services:
         :param value:
         :return:
         """
-        type_name = class_name(new_type)
-        if new_type in self._map or (
-            not isinstance(new_type, str) and type_name in self._map
-        ):
-            raise OverridingServiceException(self._map[new_type], new_type)
+        _map = self._map
+        resolver = InstanceProvider(value)
+
+        if type(new_type) is str:
+            if new_type in _map:
+                raise OverridingServiceException(new_type, value)
+            _map[new_type] = resolver
+            self._singletons[new_type] = value
+            return
 
-        def resolver(context, desired_type):
-            return value
+        type_name = class_name(new_type)
+        if new_type in _map or type_name in _map:
+            raise OverridingServiceException(new_type, value)
 
-        self._map[new_type] = resolver
-        if not isinstance(new_type, str):
-            self._map[type_name] = resolver
+        _map[new_type] = _map[type_name] = resolver
+        self._singletons[new_type] = self._singletons[type_name] = value
 
     def get(
         self,
@@ -733,79 +1152,149 @@ class Services:
         :return: an instance of the desired type
         """
         if scope is None:
+            # without a scope, scoped services cannot take precedence
+            instance = self._singletons.get(desired_type, _MISSING)
+            if instance is not _MISSING:
+                return cast(T, instance)
+            # a new scope has no scoped services to look up
             scope = ActivationScope(self)
+        else:
+            scoped_service = scope.scoped_services.get(desired_type, _MISSING)
+            if scoped_service is not _MISSING:
+                return cast(T, scoped_service)
 
         resolver = self._map.get(desired_type)
-        scoped_service = scope.scoped_services.get(desired_type) if scope else None
-
-        if not resolver and not scoped_service:
+        if resolver is None:
             if default is not ...:
                 return cast(T, default)
             raise CannotResolveTypeException(desired_type)
 
-        return cast(T, scoped_service or resolver(scope, desired_type))
+        return cast(T, resolver(scope, desired_type))
 
-    def _get_getter(self, key, param):
-        if param.annotation is _empty:
+    def _get_getter(self, key, annotation):
+        desired_type = key if annotation is _empty else annotation
 
-            def getter(context):
-                return self.get(key, context)
+        # getters only depend on the desired type, so they are shared by executors
+        try:
+            return self._getters[desired_type]
+        except KeyError:
+            pass
+        except TypeError:
+            # the annotation is not hashable
+            return self._create_getter(desired_type)
 
-        else:
+        getter = self._create_getter(desired_type)
+        self._getters[desired_type] = getter
+        return getter
 
-            def getter(context):
-                return self.get(param.annotation, context)
+    def _create_getter(self, desired_type):
+        def getter(context):
+            return self.get(desired_type, context)
 
-        getter.__name__ = f"<getter {key}>"
+        # named after the desired type, since getters are shared by parameters
+        getter.__name__ = f"<getter {class_name(desired_type)}>"
         return getter
 
     def get_executor(self, method: Callable) -> Callable:
-        sig = Signature.from_callable(method)
-        params = {
-            key: Dependency(key, value.annotation)
-            for key, value in sig.parameters.items()
-        }
+        params = _get_parameters_annotations(method)
 
-        if sys.version_info >= (3, 10):  # pragma: no cover
+        if _PY310:  # pragma: no cover
             # Python 3.10
             annotations = _get_factory_annotations_or_throw(method)
-            for key, value in params.items():
-                if key in annotations:
-                    value.annotation = annotations[key]
-
-        fns = []
+            params = {
+                key: annotations.get(key, annotation)
+                for key, annotation in params.items()
+            }
 
-        for key, value in params.items():
-            fns.append(self._get_getter(key, value))
-
-        if iscoroutinefunction(method):
-
-            async def async_executor(
-                scoped: Optional[Dict[Union[Type, str], Any]] = None
-            ):
-                with ActivationScope(self, scoped) as context:
-                    return await method(*[fn(context) for fn in fns])
-
-            return async_executor
-
-        def executor(scoped: Optional[Dict[Union[Type, str], Any]] = None):
-            with ActivationScope(self, scoped) as context:
-                return method(*[fn(context) for fn in fns])
+        fns = tuple(
+            self._get_getter(key, annotation) for key, annotation in params.items()
+        )
 
-        return executor
+        return _compile_executor_factory(len(fns), _is_coroutine_function(method))(
+            self, method, fns
+        )
 
     def exec(
         self,
         method: Callable,
         scoped: Optional[Dict[Type, Any]] = None,
     ) -> Any:
-        try:
-            executor = self._executors[method]
-        except KeyError:
-            executor = self.get_executor(method)
-            self._executors[method] = executor
+        executors = self._executors
+        executor = executors.get(method)
+        if executor is None:
+            executor = self._add_executor(method)
+        else:
+            try:
+                executors.move_to_end(method)
+            except KeyError:
+                # the executor was discarded by another thread in the meantime
+                pass
         return executor(scoped)
 
+    def precompile(self, methods: Iterable[Callable]) -> None:
+        """
+        Prepares the executors of the given methods, so that their first execution
+        does not need to inspect them.
+
+        :param methods: the methods that will be executed with exec.
+        """
+        for method in methods:
+            if method not in self._executors:
+                self._add_executor(method)
+
+    def _add_executor(self, method: Callable) -> Callable:
+        executors = self._executors
+        executor = self.get_executor(method)
+        executors[method] = executor
+        if len(executors) > _MAX_EXECUTORS:
+            # discard the least recently used executor
+            executors.popitem(last=False)
+        return executor
+
+
+def _is_coroutine_function(method) -> bool:
+    """
+    Returns a value indicating whether a method is a coroutine function. For plain
+    functions this is read from the flags of their code object.
+    """
+    # functions can be marked as coroutine functions since Python 3.12
+    if _is_plain_function(method) and not hasattr(method, "_is_coroutine_marker"):
+        return bool(method.__code__.co_flags & inspect.CO_COROUTINE)
+    return iscoroutinefunction(method)
+
+
+_EXECUTOR = """
+def make_executor(services, method, getters):
+    {unpack}
+
+    {async_def}def executor(scoped=None):
+        context = ActivationScope(services, scoped)
+        try:
+            return {await_call}method({args})
+        finally:
+            context.dispose()
+
+    return executor
+"""
+
+
+@lru_cache(maxsize=64)
+def _compile_executor_factory(arity: int, is_async: bool) -> Callable:
+    """
+    Compiles a function that returns executors calling a method with the values
+    returned by the given getters, passed as positional arguments.
+    """
+    names = ", ".join(f"g{i}" for i in range(arity))
+    source = _EXECUTOR.format(
+        unpack=f"{names}, = getters" if arity else "",
+        async_def="async " if is_async else "",
+        await_call="await " if is_async else "",
+        args=", ".join(f"g{i}(context)" for i in range(arity)),
+    )
+    namespace: Dict[str, Any] = {}
+    exec(source, {"ActivationScope": ActivationScope}, namespace)
+    return namespace["make_executor"]
+
 
 FactoryCallableNoArguments = Callable[[], Any]
 FactoryCallableSingleArgument = Callable[[ActivationScope], Any]
@@ -842,19 +1331,51 @@ class Container(ContainerProtocol):
     Configuration class for a collection of services.
     """
 
-    __slots__ = ("_map", "_aliases", "_exact_aliases", "strict")
+    __slots__ = (
+        "_map",
+        "_aliases",
+        "_exact_aliases",
+        "_provider",
+        "_provider_map",
+        "_resolved",
+        "_dirty_types",
+        "strict",
+    )
 
     def __init__(self, *, strict: bool = False):
         self._map: Dict[Type, Callable] = {}
-        self._aliases: DefaultDict[str, Set[Type]] = defaultdict(set)
+        self._aliases: Dict[str, Set[Type]] = {}
         self._exact_aliases: Dict[str, Type] = {}
         self._provider: Optional[Services] = None
+        # services map and resolvers by type of the cached provider, as built by the
+        # container: changes applied to the provider with Services.set are ignored
+        self._provider_map: Dict[Union[str, Type], Type] = {}
+        self._resolved: Dict[Type, Callable] = {}
+        # insertion ordered, so that extending a provider merges names like a rebuild
+        self._dirty_types: Dict[Type, None] = {}
         self.strict = strict
 
     @property
     def provider(self) -> Services:
         if self._provider is None:
-            self._provider = self.build_provider()
+            # singletons activated by a previous provider are kept
+            self._provider = self._build_cached_provider(
+                self._map.items(),
+                {},
+                {
+                    key: value
+                    for key, value in self._resolved.items()
+                    if isinstance(value, _ACTIVATED_SINGLETON_PROVIDERS)
+                },
+            )
+        elif self._dirty_types:
+            # only the types registered after the provider was built need to be
+            # resolved, the rest of the services map can be reused
+            self._provider = self._build_cached_provider(
+                ((key, self._map[key]) for key in self._dirty_types),
+                self._provider_map,
+                self._resolved,
+            )
         return self._provider
 
     def __iter__(self):
@@ -925,7 +1446,8 @@ class Container(ContainerProtocol):
             raise InvalidOperationInStrictMode()
         if name in self._aliases or name in self._exact_aliases:
             raise AliasAlreadyDefined(name)
-        self._aliases[name].add(desired_type)
+        self._aliases.setdefault(name, set()).add(desired_type)
+        self._provider = None
         return self
 
     def add_aliases(self, values: AliasesTypeHint):
@@ -953,6 +1475,7 @@ class Container(ContainerProtocol):
         if not override and name in self._exact_aliases:
             raise AliasAlreadyDefined(name)
         self._exact_aliases[name] = desired_type
+        self._provider = None
         return self
 
     def set_aliases(self, values: AliasesTypeHint, override: bool = False):
@@ -970,18 +1493,23 @@ class Container(ContainerProtocol):
         if key in self._map:
             raise OverridingServiceException(key, value)
         self._map[key] = value
+        self._dirty_types[key] = None
 
-        if self._provider is not None:
-            self._provider = None
+        if self.strict:
+            return
 
         key_name = class_name(key)
 
-        if self.strict or "." in key_name:
+        if "." in key_name:
             return
 
-        self._aliases[key_name].add(key)
-        self._aliases[key_name.lower()].add(key)
-        self._aliases[to_standard_param_name(key_name)].add(key)
+        for alias in _get_inferred_aliases(key, key_name):
+            types = self._aliases.setdefault(alias, set())
+            if types:
+                # the alias becomes ambiguous: services resolved by parameter name
+                # must be resolved again
+                self._provider = None
+            types.add(key)
 
     def add_instance(
         self, instance: Any, declared_class: Optional[Type] = None
@@ -1058,7 +1586,6 @@ class Container(ContainerProtocol):
         :param concrete_type: concrete class
         :return: the service collection itself
         """
-        assert not isabstract(concrete_type)
         self._bind(
             concrete_type,
             DynamicResolver(concrete_type, self, ServiceLifeStyle.SINGLETON),
@@ -1072,7 +1599,6 @@ class Container(ContainerProtocol):
         :param concrete_type: concrete class
         :return: the service collection itself
         """
-        assert not isabstract(concrete_type)
         self._bind(
             concrete_type, DynamicResolver(concrete_type, self, ServiceLifeStyle.SCOPED)
         )
@@ -1085,7 +1611,6 @@ class Container(ContainerProtocol):
         :param concrete_type: concrete class
         :return: the service collection itself
         """
-        assert not isabstract(concrete_type)
         self._bind(
             concrete_type,
             DynamicResolver(concrete_type, self, ServiceLifeStyle.TRANSIENT),
@@ -1111,11 +1636,9 @@ class Container(ContainerProtocol):
         return self
 
     @staticmethod
-    def _check_factory(factory, signature, handled_type) -> Callable:
+    def _check_factory(factory, params_len, handled_type) -> Callable:
         assert callable(factory), "The factory must be callable"
 
-        params_len = len(signature.parameters)
-
         if params_len == 0:
             return FactoryWrapperNoArgs(factory)
 
@@ -1136,11 +1659,11 @@ class Container(ContainerProtocol):
         if not callable(factory):
             raise InvalidFactory(return_type)
 
-        sign = Signature.from_callable(factory)
+        params_len, return_annotation = _get_factory_signature(factory)
         if return_type is None:
-            if sign.return_annotation is _empty:
+            if return_annotation is _empty:
                 raise MissingTypeException()
-            return_type = sign.return_annotation
+            return_type = return_annotation
 
             if isinstance(return_type, str):  # pragma: no cover
                 # Python 3.10
@@ -1150,7 +1673,9 @@ class Container(ContainerProtocol):
         self._bind(
             return_type,  # type: ignore
             FactoryResolver(
-                return_type, self._check_factory(factory, sign, return_type), life_style
+                return_type,
+                self._check_factory(factory, params_len, return_type),
+                life_style,
             ),
         )
 
@@ -1167,49 +1692,83 @@ class Container(ContainerProtocol):
         """
         with ResolutionContext() as context:
             _map: Dict[Union[str, Type], Type] = {}
+            self._resolve_services(context, self._map.items(), _map)
 
-            for _type, resolver in self._map.items():
-                if isinstance(resolver, DynamicResolver):
-                    context.dynamic_chain.clear()
-
-                if _type in context.resolved:
-                    # assert _type not in context.resolved, "_map keys must be unique"
-                    # check if its in the map
-                    if _type in _map:
-                        # NB: do not call resolver if one was already prepared for the
-                        # type
-                        raise OverridingServiceException(_type, resolver)
-                    else:
-                        resolved = context.resolved[_type]
-                else:
-                    # add to context so that we don't repeat operations
-                    resolved = resolver(context)
-                    context.resolved[_type] = resolved
+        return Services(_map)
 
-                _map[_type] = resolved
+    def _build_cached_provider(
+        self,
+        resolvers: Iterable[Tuple[Type, Callable]],
+        services_map: Dict[Union[str, Type], Type],
+        resolved: Dict[Type, Callable],
+    ) -> Services:
+        """
+        Returns the service provider cached by the container, resolving the given
+        types on top of a copy of the given services map. Types that are already
+        resolved reuse the given resolvers, so that singletons are not instantiated
+        more than once.
+        """
+        _map = dict(services_map)
 
-                type_name = class_name(_type)
-                if "." not in type_name:
-                    _map[type_name] = _map[_type]
+        with ResolutionContext() as context:
+            context.resolved.update(resolved)
+            self._resolve_services(context, resolvers, _map)
+            self._resolved = dict(context.resolved)
 
-            if not self.strict:
-                assert self._aliases is not None
-                assert self._exact_aliases is not None
+        self._provider_map = dict(_map)
+        self._dirty_types.clear()
+        return Services(_map)
 
-                # include aliases in the map;
-                for name, _types in self._aliases.items():
-                    for _type in _types:
-                        break
-                    _map[name] = self._get_alias_target_type(name, _map, _type)
+    def _resolve_services(
+        self,
+        context: ResolutionContext,
+        resolvers: Iterable[Tuple[Type, Callable]],
+        _map: Dict[Union[str, Type], Type],
+    ) -> None:
+        names: Dict[str, Type] = {}
+
+        for _type, resolver in resolvers:
+            # the chain is only used by dynamic resolvers, to report circular
+            # dependencies: resetting it for other resolvers is harmless
+            context.dynamic_chain.clear()
+
+            if _type in context.resolved:
+                # assert _type not in context.resolved, "_map keys must be unique"
+                # check if its in the map
+                if _type in _map:
+                    # NB: do not call resolver if one was already prepared for the
+                    # type
+                    raise OverridingServiceException(_type, resolver)
+                else:
+                    resolved = context.resolved[_type]
+            else:
+                # add to context so that we don't repeat operations
+                resolved = resolver(context)
+                context.resolved[_type] = resolved
 
-                for name, _type in self._exact_aliases.items():
-                    _map[name] = self._get_alias_target_type(name, _map, _type)
+            _map[_type] = resolved
 
-        return Services(_map)
+            type_name = class_name(_type)
+            if "." not in type_name:
+                names[type_name] = resolved
+
+        if not self.strict:
+            # aliases are resolved against the types entries, then merged with
+            # class names: exact aliases win over inferred ones, which win over names
+            inferred_aliases = {
+                name: next(iter(_types)) for name, _types in self._aliases.items()
+            }
+
+            for aliases in (inferred_aliases, self._exact_aliases):
+                self._ensure_alias_targets(aliases, _map)
+                names.update({name: _map[_type] for name, _type in aliases.items()})
+
+        # include class names and aliases in the map, all at once
+        _map.update(names)
 
     @staticmethod
-    def _get_alias_target_type(name, _map, _type):
-        try:
-            return _map[_type]
-        except KeyError:
-            raise AliasConfigurationError(name, _type)
+    def _ensure_alias_targets(aliases: Dict[str, Type], _map) -> None:
+        missing = [name for name, _type in aliases.items() if _type not in _map]
+        if missing:
+            name = missing[0]
+            raise AliasConfigurationError(name, aliases[name])
@@ -265,3 +265,24 @@ class PrecedenceOfTypeHintsOverNames:
     def __init__(self, foo: Q, ko: P):
         self.q = foo
         self.p = ko
+
+
+class Logger:
+    def __init__(self, name):
+        self.name = name
+
+
+class HelpController:
+    def __init__(self, logger: Logger):
+        self.logger = logger
+
+
+class HomeController:
+    def __init__(self, logger: Logger):
+        self.logger = logger
+
+
+class FooController:
+    def __init__(self, foo: Foo, logger: Logger):
+        self.foo = foo
+        self.logger = logger
@@ -2,6 +2,8 @@
 Functions exec tests.
 exec functions are designed to enable executing any function injecting parameters.
 """
+import inspect
+
 import pytest
 
 from rodi import Container, inject
@@ -153,3 +155,136 @@ async def test_async_executor():
 
     assert called
     assert result == Context().trace_id
+
+
+def test_exec_discards_least_recently_used_executors(monkeypatch):
+    monkeypatch.setattr("rodi._MAX_EXECUTORS", 2)
+
+    container = Container()
+    container.add_scoped(Context)
+
+    provider = container.build_provider()
+
+    @inject()
+    def first(context: Context):
+        return 1
+
+    @inject()
+    def second(context: Context):
+        return 2
+
+    @inject()
+    def third(context: Context):
+        return 3
+
+    assert provider.exec(first) == 1
+    assert provider.exec(second) == 2
+    assert provider.exec(first) == 1
+    assert provider.exec(third) == 3
+
+    assert list(provider._executors) == [first, third]
+    assert provider.exec(second) == 2
+    assert list(provider._executors) == [third, second]
+
+
+def test_exec_methods():
+    container = Container()
+    container.add_scoped(Context)
+
+    provider = container.build_provider()
+
+    class Handler:
+        @inject()
+        def handle(self, context: Context):
+            return context.trace_id
+
+    assert provider.exec(Handler().handle) == Context().trace_id
+
+
+@pytest.mark.parametrize("arity", [0, 1, 2, 3])
+def test_exec_functions_with_any_number_of_parameters(arity):
+    container = Container()
+    container.add_scoped(Context)
+
+    provider = container.build_provider()
+
+    @inject()
+    def fn(*args):
+        assert all(arg is args[0] for arg in args)
+        return len(args)
+
+    fn.__signature__ = inspect.Signature(
+        [
+            inspect.Parameter(
+                f"context_{i}", inspect.Parameter.POSITIONAL_ONLY, annotation=Context
+            )
+            for i in range(arity)
+        ]
+    )
+    fn.__annotations__ = {f"context_{i}": Context for i in range(arity)}
+
+    assert provider.exec(fn) == arity
+
+
+def test_executors_share_getters():
+    container = Container()
+    container.add_scoped(Context)
+
+    provider = container.build_provider()
+
+    @inject()
+    def first(context: Context):
+        return context
+
+    @inject()
+    def second(other: Context):
+        return other
+
+    assert isinstance(provider.exec(first), Context)
+    assert isinstance(provider.exec(second), Context)
+
+    assert list(provider._getters) == [Context]
+    assert provider._getters[Context].__name__ == "<getter Context>"
+
+
+def test_precompile_executors():
+    container = Container()
+    container.add_scoped(Context)
+
+    provider = container.build_provider()
+
+    @inject()
+    def first(context: Context):
+        return 1
+
+    @inject()
+    def second(context: Context):
+        return 2
+
+    provider.precompile([first, second])
+
+    executors = dict(provider._executors)
+    assert list(executors) == [first, second]
+
+    provider.precompile([first])
+
+    assert provider.exec(first) == 1
+    assert provider.exec(second) == 2
+    assert dict(provider._executors) == executors
+
+
+@pytest.mark.asyncio
+async def test_async_executor_for_methods():
+    container = Container()
+    container.add_scoped(Context)
+
+    provider = container.build_provider()
+
+    class Handler:
+        @inject()
+        async def handle(self, context: Context):
+            return context.trace_id
+
+    executor = provider.get_executor(Handler().handle)
+
+    assert await executor() == Context().trace_id
@@ -1,4 +1,8 @@
+import functools
+import gc
+import inspect
 import sys
+import weakref
 from abc import ABC
 from dataclasses import dataclass
 from typing import (
@@ -18,6 +22,7 @@ from typing import (
 import pytest
 from pytest import raises
 
+import rodi
 from rodi import (
     ActivationScope,
     AliasAlreadyDefined,
@@ -38,6 +43,7 @@ from rodi import (
     Services,
     UnsupportedUnionTypeException,
     _get_factory_annotations_or_throw,
+    class_name,
     inject,
     to_standard_param_name,
 )
@@ -51,9 +57,12 @@ from tests.examples import (
     Circle2,
     Foo,
     FooByParamName,
+    FooController,
     FooDBCatsRepository,
     FooDBContext,
     GetCatRequestHandler,
+    HelpController,
+    HomeController,
     IByParamName,
     ICatsRepository,
     ICircle,
@@ -63,6 +72,7 @@ from tests.examples import (
     Jang,
     Jing,
     Ko,
+    Logger,
     Ok,
     P,
     PrecedenceOfTypeHintsOverNames,
@@ -122,16 +132,23 @@ def arrange_cats_example():
     return container
 
 
-@pytest.mark.parametrize(
-    "value,expected_result",
-    (
-        ("CamelCase", "camel_case"),
-        ("HTTPResponse", "http_response"),
-        ("ICatsRepository", "icats_repository"),
-        ("Cat", "cat"),
-        ("UFO", "ufo"),
-    ),
+def add_exact_transients(container, *types):
+    for service_type in types:
+        container._add_exact_transient(service_type)
+    return container
+
+
+STANDARD_PARAM_CASES = (
+    ("CamelCase", "camel_case"),
+    ("HTTPResponse", "http_response"),
+    ("ICatsRepository", "icats_repository"),
+    ("CatsController", "cats_controller"),
+    ("Cat", "cat"),
+    ("UFO", "ufo"),
 )
+
+
+@pytest.mark.parametrize("value,expected_result", STANDARD_PARAM_CASES)
 def test_standard_param_name(value, expected_result):
     snaked = to_standard_param_name(value)
     assert snaked == expected_result
@@ -161,6 +178,151 @@ def test_transient_by_type_without_parameters():
     assert cats_repo is not other_cats_repo
 
 
+def _get_type_with_dependencies(arity):
+    names = [f"dependency_{i}" for i in range(arity)]
+    dependencies = [type(f"Dependency{i}", (), {}) for i in range(arity)]
+
+    def __init__(self, *args):
+        self.args = args
+
+    __init__.__signature__ = inspect.Signature(
+        [inspect.Parameter("self", inspect.Parameter.POSITIONAL_OR_KEYWORD)]
+        + [
+            inspect.Parameter(
+                name, inspect.Parameter.POSITIONAL_OR_KEYWORD, annotation=dependency
+            )
+            for name, dependency in zip(names, dependencies)
+        ]
+    )
+    __init__.__annotations__ = dict(zip(names, dependencies))
+
+    return type("Service", (), {"__init__": __init__}), dependencies
+
+
+@pytest.mark.parametrize("arity", [0, 1, 2, 3, 4, 5, 6])
+def test_transient_by_type_with_many_parameters(arity):
+    Service, dependencies = _get_type_with_dependencies(arity)
+
+    container = Container()
+    container.register(Service)
+    for dependency in dependencies:
+        container.register(dependency)
+
+    service = container.resolve(Service)
+
+    assert [type(arg) for arg in service.args] == dependencies
+
+
+def test_args_type_provider_can_be_subclassed():
+    class CustomArgsTypeProvider(rodi.ArgsTypeProvider):
+        def __call__(self, context, parent_type):
+            return ("custom", super().__call__(context, parent_type))
+
+    provider = CustomArgsTypeProvider(list, [])
+
+    assert type(provider) is CustomArgsTypeProvider
+    assert provider(None, None) == ("custom", [])
+
+
+@pytest.mark.parametrize("arity", [0, 1, 2, 3, 4, 5, 6])
+def test_scoped_by_type_with_many_parameters(arity):
+    Service, dependencies = _get_type_with_dependencies(arity)
+
+    container = Container()
+    container.add_scoped(Service)
+    for dependency in dependencies:
+        container.register(dependency)
+
+    provider = container.build_provider()
+
+    with ActivationScope(provider) as scope:
+        service = provider.get(Service, scope)
+
+        assert provider.get(Service, scope) is service
+        assert [type(arg) for arg in service.args] == dependencies
+
+    with ActivationScope(provider) as scope:
+        assert provider.get(Service, scope) is not service
+
+
+def test_scoped_args_type_provider_can_be_subclassed():
+    class CustomScopedArgsTypeProvider(rodi.ScopedArgsTypeProvider):
+        pass
+
+    provider = CustomScopedArgsTypeProvider(list, [])
+
+    assert type(provider) is CustomScopedArgsTypeProvider
+
+    with ActivationScope() as scope:
+        service = provider(scope, None)
+
+        assert service == []
+        assert provider(scope, None) is service
+
+
+def test_stateless_type_providers_are_shared():
+    container = Container()
+    container.add_transient(ICatsRepository, InMemoryCatsRepository)
+    container.add_scoped(IdGetter)
+
+    first_map = container.build_provider()._map
+    second_map = container.build_provider()._map
+
+    assert first_map[ICatsRepository] is second_map[ICatsRepository]
+    assert first_map[IdGetter] is second_map[IdGetter]
+
+    transient_provider = rodi.TypeProvider.get(IdGetter)
+    assert transient_provider is not rodi.ScopedTypeProvider.get(IdGetter)
+
+
+@pytest.fixture
+def get_type_hints_calls(monkeypatch):
+    """Records the objects whose type hints are evaluated by rodi."""
+    calls = []
+    get_type_hints = rodi.get_type_hints
+
+    def spy(obj, *args, **kwargs):
+        calls.append(obj)
+        return get_type_hints(obj, *args, **kwargs)
+
+    monkeypatch.setattr(rodi, "get_type_hints", spy)
+    return calls
+
+
+def test_type_hints_are_inspected_once_per_type(get_type_hints_calls):
+    class A:
+        pass
+
+    class B:
+        a: A
+
+    for _ in range(3):
+        container = Container()
+        container.add_transient(A)
+        container.add_transient(B)
+        b = container.build_provider().get(B)
+        assert isinstance(b.a, A)
+
+    assert get_type_hints_calls.count(B) == 1
+
+
+def test_init_type_hints_are_not_evaluated_for_plain_classes(get_type_hints_calls):
+    class A:
+        pass
+
+    class B:
+        def __init__(self, a: A) -> None:
+            self.a = a
+
+    container = Container()
+    container.add_transient(A)
+    container.add_transient(B)
+    provider = container.build_provider()
+
+    assert isinstance(provider.get(B).a, A)
+    assert B.__init__ not in get_type_hints_calls
+
+
 def test_transient_by_type_with_parameters():
     container = Container()
     container.add_transient(ICatsRepository, FooDBCatsRepository)
@@ -342,11 +504,7 @@ def test_raises_for_nested_circular_dependency():
 
 
 def test_interdependencies():
-    container = Container()
-    container._add_exact_transient(A)
-    container._add_exact_transient(B)
-    container._add_exact_transient(C)
-    container._add_exact_transient(IdGetter)
+    container = add_exact_transients(Container(), A, B, C, IdGetter)
     provider = container.build_provider()
 
     c = provider.get(C)
@@ -566,6 +724,42 @@ def test_scoped_service_from_scoped_services():
     assert e is None
 
 
+def test_falsy_scoped_service_from_scoped_services():
+    class Settings(dict):
+        pass
+
+    container = Container()
+    container.add_transient(Settings)
+    provider = container.build_provider()
+
+    scoped_settings = Settings()
+
+    with ActivationScope(provider, {Settings: scoped_settings}) as context:
+        a = provider.get(Settings, context)
+
+    assert a is scoped_settings
+
+
+def test_instance_is_overridden_by_scoped_services():
+    class Settings:
+        pass
+
+    settings = Settings()
+    container = Container()
+    container.add_instance(settings)
+    provider = container.build_provider()
+
+    assert provider.get(Settings) is settings
+    assert provider.get("Settings") is settings
+
+    scoped_settings = Settings()
+
+    with ActivationScope(provider, {Settings: scoped_settings}) as context:
+        assert provider.get(Settings, context) is scoped_settings
+
+    assert provider.get(Settings) is settings
+
+
 def test_scoped_services_with_shortcut():
     container = Container()
     container.add_scoped(IdGetter)
@@ -692,8 +886,9 @@ def test_get_service_by_name_or_alias():
     container.add_alias("k", CatsController)
 
     provider = container.build_provider()
+    alias = dict(STANDARD_PARAM_CASES)["CatsController"]
 
-    for name in {"CatsController", "cats_controller", "k"}:
+    for name in {"CatsController", alias, "k"}:
         service = provider.get(name)
 
         assert isinstance(service, CatsController)
@@ -750,11 +945,43 @@ def test_by_factory_type_annotation_simple_local():
     assert cat.name == "Celine"
 
 
-@pytest.mark.parametrize(
-    "method_name",
-    ["add_singleton_by_factory", "add_transient_by_factory", "add_scoped_by_factory"],
+def _assert_singleton_cat(provider, cat):
+    assert provider.get(Cat) is cat
+
+
+def _assert_transient_cat(provider, cat):
+    assert provider.get(Cat) is not cat
+    assert provider.get(Cat) is not cat
+    assert provider.get(Cat) is not cat
+
+
+def _assert_scoped_cat(provider, cat):
+    with ActivationScope() as context:
+        cat_2 = provider.get(Cat, context)
+        assert cat_2 is not cat
+
+        assert provider.get(Cat, context) is cat_2
+        assert provider.get(Cat, context) is cat_2
+        assert provider.get(Cat, context) is cat_2
+
+
+FACTORY_METHOD_NAMES = (
+    "add_singleton_by_factory",
+    "add_transient_by_factory",
+    "add_scoped_by_factory",
 )
-def test_by_factory_type_annotation(method_name):
+
+FACTORY_METHODS = [
+    pytest.param(method_name, check_lifestyle, id=method_name)
+    for method_name, check_lifestyle in zip(
+        FACTORY_METHOD_NAMES,
+        (_assert_singleton_cat, _assert_transient_cat, _assert_scoped_cat),
+    )
+]
+
+
+@pytest.mark.parametrize("method_name,check_lifestyle", FACTORY_METHODS)
+def test_by_factory_type_annotation(method_name, check_lifestyle):
     container = Container()
 
     def factory(_) -> Cat:
@@ -771,57 +998,43 @@ def test_by_factory_type_annotation(method_name):
     assert cat is not None
     assert cat.name == "Celine"
 
-    if method_name == "add_singleton_by_factory":
-        cat_2 = provider.get(Cat)
-        assert cat_2 is cat
-
-    if method_name == "add_transient_by_factory":
-        assert provider.get(Cat) is not cat
-        assert provider.get(Cat) is not cat
-        assert provider.get(Cat) is not cat
+    check_lifestyle(provider, cat)
 
-    if method_name == "add_scoped_by_factory":
-        with ActivationScope() as context:
-            cat_2 = provider.get(Cat, context)
-            assert cat_2 is not cat
-
-            assert provider.get(Cat, context) is cat_2
-            assert provider.get(Cat, context) is cat_2
-            assert provider.get(Cat, context) is cat_2
 
+def cat_factory_three_args(context, activating_type, extra_argument_mistake):
+    return Cat("Celine")
 
-@pytest.mark.parametrize(
-    "method_name",
-    ["add_singleton_by_factory", "add_transient_by_factory", "add_scoped_by_factory"],
-)
-def test_invalid_factory_too_many_arguments_throws(method_name):
-    container = Container()
-    method = getattr(container, method_name)
 
-    def factory(context, activating_type, extra_argument_mistake):
-        return Cat("Celine")
+def cat_factory_four_args(context, activating_type, extra_argument_mistake, two):
+    return Cat("Celine")
 
-    with raises(InvalidFactory):
-        method(factory, Cat)
 
-    def factory(context, activating_type, extra_argument_mistake, two):
-        return Cat("Celine")
+def cat_factory_five_args(
+    context,
+    activating_type,
+    extra_argument_mistake,
+    two,
+    three,
+):
+    return Cat("Celine")
 
-    with raises(InvalidFactory):
-        method(factory, Cat)
 
-    def factory(context, activating_type, extra_argument_mistake, two, three):
-        return Cat("Celine")
+@pytest.mark.parametrize("method_name", FACTORY_METHOD_NAMES)
+def test_invalid_factory_too_many_arguments_throws(method_name):
+    container = Container()
+    method = getattr(container, method_name)
 
-    with raises(InvalidFactory):
-        method(factory, Cat)
+    for factory in (
+        cat_factory_three_args,
+        cat_factory_four_args,
+        cat_factory_five_args,
+    ):
+        with raises(InvalidFactory):
+            method(factory, Cat)
 
 
-@pytest.mark.parametrize(
-    "method_name",
-    ["add_singleton_by_factory", "add_transient_by_factory", "add_scoped_by_factory"],
-)
-def test_add_singleton_by_factory_given_type(method_name):
+@pytest.mark.parametrize("method_name,check_lifestyle", FACTORY_METHODS)
+def test_add_singleton_by_factory_given_type(method_name, check_lifestyle):
     container = Container()
 
     def factory(a):
@@ -838,29 +1051,10 @@ def test_add_singleton_by_factory_given_type(method_name):
     assert cat is not None
     assert cat.name == "Celine"
 
-    if method_name == "add_singleton_by_factory":
-        cat_2 = provider.get(Cat)
-        assert cat_2 is cat
-
-    if method_name == "add_transient_by_factory":
-        assert provider.get(Cat) is not cat
-        assert provider.get(Cat) is not cat
-        assert provider.get(Cat) is not cat
-
-    if method_name == "add_scoped_by_factory":
-        with ActivationScope() as context:
-            cat_2 = provider.get(Cat, context)
-            assert cat_2 is not cat
+    check_lifestyle(provider, cat)
 
-            assert provider.get(Cat, context) is cat_2
-            assert provider.get(Cat, context) is cat_2
-            assert provider.get(Cat, context) is cat_2
 
-
-@pytest.mark.parametrize(
-    "method_name",
-    ["add_singleton_by_factory", "add_transient_by_factory", "add_scoped_by_factory"],
-)
+@pytest.mark.parametrize("method_name", FACTORY_METHOD_NAMES)
 def test_add_singleton_by_factory_raises_for_missing_type(method_name):
     container = Container()
 
@@ -873,6 +1067,52 @@ def test_add_singleton_by_factory_raises_for_missing_type(method_name):
         method(factory)
 
 
+def test_singleton_by_factory_is_created_once_even_if_falsy():
+    calls = 0
+
+    class Settings(dict):
+        pass
+
+    def factory() -> Settings:
+        nonlocal calls
+        calls += 1
+        return Settings()
+
+    container = Container()
+    container.add_singleton_by_factory(factory)
+    provider = container.build_provider()
+
+    settings = provider.get(Settings)
+
+    assert provider.get(Settings) is settings
+    assert provider.get(Settings) is settings
+    assert calls == 1
+
+
+def test_singleton_type_provider_can_be_subclassed():
+    class CustomSingletonTypeProvider(rodi.SingletonTypeProvider):
+        pass
+
+    provider = CustomSingletonTypeProvider(list)
+
+    instance = provider(None, None)
+
+    assert provider(None, None) is instance
+    assert type(provider) is CustomSingletonTypeProvider
+
+
+def test_singleton_factory_type_provider_can_be_subclassed():
+    class CustomSingletonFactoryTypeProvider(rodi.SingletonFactoryTypeProvider):
+        pass
+
+    provider = CustomSingletonFactoryTypeProvider(list, lambda context, _: [])
+
+    instance = provider(None, None)
+
+    assert provider(None, None) is instance
+    assert type(provider) is CustomSingletonFactoryTypeProvider
+
+
 def test_singleton_by_provider():
     container = Container()
     container._add_exact_singleton(P)
@@ -922,13 +1162,9 @@ def test_singleton_by_provider_both_singletons():
 
 
 def test_type_hints_precedence():
-    container = Container()
-    container._add_exact_transient(PrecedenceOfTypeHintsOverNames)
-    container._add_exact_transient(Foo)
-    container._add_exact_transient(Q)
-    container._add_exact_transient(P)
-    container._add_exact_transient(Ko)
-    container._add_exact_transient(Ok)
+    container = add_exact_transients(
+        Container(), PrecedenceOfTypeHintsOverNames, Foo, Q, P, Ko, Ok
+    )
 
     provider = container.build_provider()
 
@@ -958,12 +1194,9 @@ def test_type_hints_precedence_with_shortcuts():
 
 
 def test_proper_handling_of_inheritance():
-    container = Container()
-    container._add_exact_transient(UfoOne)
-    container._add_exact_transient(UfoTwo)
-    container._add_exact_transient(UfoThree)
-    container._add_exact_transient(UfoFour)
-    container._add_exact_transient(Foo)
+    container = add_exact_transients(
+        Container(), UfoOne, UfoTwo, UfoThree, UfoFour, Foo
+    )
 
     provider = container.build_provider()
 
@@ -997,11 +1230,7 @@ def cat_factory_with_context_and_activating_type(context, activating_type) -> Ca
     "method_name,factory",
     [
         (name, method)
-        for name in [
-            "add_singleton_by_factory",
-            "add_transient_by_factory",
-            "add_scoped_by_factory",
-        ]
+        for name in FACTORY_METHOD_NAMES
         for method in [
             cat_factory_no_args,
             cat_factory_with_context,
@@ -1023,31 +1252,51 @@ def test_by_factory_with_different_parameters(method_name, factory):
     assert cat.name == "Celine"
 
 
-@pytest.mark.parametrize(
-    "method_name", ["add_transient_by_factory", "add_scoped_by_factory"]
-)
-def test_factory_can_receive_activating_type_as_parameter(method_name):
-    @inject()
-    class Logger:
-        def __init__(self, name):
-            self.name = name
+def test_by_factory_bound_method_and_wrapped_function():
+    class CatsFactory:
+        def create_cat(self, context) -> Cat:
+            assert isinstance(context, ActivationScope)
+            return Cat("Celine")
 
-    @inject()
-    class HelpController:
-        def __init__(self, logger: Logger):
-            self.logger = logger
+    @functools.wraps(cat_factory_with_context_and_activating_type)
+    def wrapped_factory(*args):
+        return cat_factory_with_context_and_activating_type(*args)
 
-    @inject()
-    class HomeController:
-        def __init__(self, logger: Logger):
-            self.logger = logger
+    for factory in (CatsFactory().create_cat, wrapped_factory):
+        container = Container()
+        container.add_transient_by_factory(factory)
 
-    @inject()
-    class FooController:
-        def __init__(self, foo: Foo, logger: Logger):
-            self.foo = foo
-            self.logger = logger
+        provider = container.build_provider()
+
+        assert provider.get(Cat).name == "Celine"
+
+
+def test_by_factory_uses_explicit_signature():
+    calls = []
+
+    def factory(context=None, activating_type=None):
+        calls.append((context, activating_type))
+        return Cat("Celine")
+
+    factory.__signature__ = inspect.Signature(
+        [inspect.Parameter("context", inspect.Parameter.POSITIONAL_OR_KEYWORD)],
+        return_annotation=Cat,
+    )
 
+    container = Container()
+    container.add_transient_by_factory(factory)
+    provider = container.build_provider()
+
+    assert provider.get(Cat).name == "Celine"
+    assert len(calls) == 1
+    assert isinstance(calls[0][0], ActivationScope)
+    assert calls[0][1] is None
+
+
+@pytest.mark.parametrize(
+    "method_name", ["add_transient_by_factory", "add_scoped_by_factory"]
+)
+def test_factory_can_receive_activating_type_as_parameter(method_name):
     container = Container()
     container._add_exact_transient(Foo)
 
@@ -1068,19 +1317,19 @@ def test_factory_can_receive_activating_type_as_parameter(method_name):
 
     assert help_controller is not None
     assert help_controller.logger is not None
-    assert help_controller.logger.name == "tests.test_services.HelpController"
+    assert help_controller.logger.name == "tests.examples.HelpController"
 
     home_controller = provider.get(HomeController)
 
     assert home_controller is not None
     assert home_controller.logger is not None
-    assert home_controller.logger.name == "tests.test_services.HomeController"
+    assert home_controller.logger.name == "tests.examples.HomeController"
 
     foo_controller = provider.get(FooController)
 
     assert foo_controller is not None
     assert foo_controller.logger is not None
-    assert foo_controller.logger.name == "tests.test_services.FooController"
+    assert foo_controller.logger.name == "tests.examples.FooController"
 
 
 def test_factory_can_receive_activating_type_as_parameter_nested_resolution():
@@ -1315,9 +1564,15 @@ def test_set_alias_requires_configured_type():
 
     container.set_alias("something", Cat)
 
-    with raises(AliasConfigurationError):
+    with raises(AliasConfigurationError) as context:
         container.build_provider()
 
+    assert context.value.args == ("something", Cat)
+    assert str(context.value) == (
+        "An alias 'something' for type 'Cat' was defined, "
+        "but the type was not configured in the Container."
+    )
+
 
 def test_set_aliases():
     container = Container()
@@ -1461,6 +1716,18 @@ def test_services_set_throws_if_service_is_already_defined():
         services.set("example", [])
 
 
+def test_services_set_throws_if_class_name_is_already_defined():
+    services = Services()
+
+    services.set("Cat", Cat("Celine"))
+
+    with raises(OverridingServiceException) as error:
+        services.set(Cat, Cat("Tom"))
+
+    assert error.value.args[0] is Cat
+    assert services.get("Cat").name == "Celine"
+
+
 def test_scoped_services_exact():
     container = Container()
 
@@ -1846,6 +2113,62 @@ def test_annotation_resolution():
     assert instance.dep is b_singleton
 
 
+def test_annotation_resolution_with_many_attributes_and_any_names():
+    class B:
+        pass
+
+    class C:
+        pass
+
+    @inject()
+    class A:
+        first: B
+        second: C
+        third: B
+
+    A.__annotations__["not an identifier"] = C
+
+    container = Container()
+    container.add_transient(B)
+    container.add_transient(C)
+    container._add_exact_transient(A)
+
+    provider = container.build_provider()
+
+    instance = provider.get(A)
+
+    assert isinstance(instance.first, B)
+    assert isinstance(instance.second, C)
+    assert isinstance(instance.third, B)
+    assert isinstance(getattr(instance, "not an identifier"), C)
+    assert instance.first is not instance.third
+
+
+def test_annotation_resolution_ignores_reserved_names():
+    class B:
+        pass
+
+    class C:
+        pass
+
+    @inject()
+    class A:
+        args: B
+        dep: C
+
+    container = Container()
+    container.add_transient(B)
+    container.add_transient(C)
+    container._add_exact_transient(A)
+
+    provider = container.build_provider()
+
+    instance = provider.get(A)
+
+    assert isinstance(instance.dep, C)
+    assert not hasattr(instance, "args")
+
+
 def test_annotation_resolution_scoped():
     class B:
         pass
@@ -2194,6 +2517,51 @@ def test_list_generic_alias_list():
     assert instance.b == list_str_factory()
 
 
+@pytest.mark.parametrize(
+    "value,expected_name",
+    [
+        ("Cat", "Cat"),
+        (Cat, "Cat"),
+        (list, "list"),
+        (set, "set"),
+    ]
+    + (
+        [(list[int], "list[int]"), (set[str], "set[str]")]
+        if sys.version_info >= (3, 9)
+        else []
+    ),
+)
+def test_class_name(value, expected_name):
+    assert class_name(value) == expected_name
+
+
+def test_resolved_types_are_not_kept_alive():
+    Service = type("Service", (), {})
+    reference = weakref.ref(Service)
+
+    container = Container()
+    container.register(Service)
+    assert isinstance(container.resolve(Service), Service)
+
+    del container, Service
+    # the first collection releases the shared type providers, the second one the
+    # types they were cached by
+    gc.collect()
+    gc.collect()
+
+    assert reference() is None
+
+
+def test_exception_message_with_unhashable_type():
+    desired_type = ["not", "a", "type"]
+    exception = CannotResolveParameterException("foo", desired_type)
+
+    assert exception.args == ("foo", desired_type)
+    assert str(exception) == (
+        "Unable to resolve parameter 'foo' when resolving '['not', 'a', 'type']'"
+    )
+
+
 @pytest.mark.skipif(sys.version_info < (3, 9), reason="requires Python 3.9")
 def test_dict_generic_alias_dict():
     container = Container()
@@ -2339,6 +2707,44 @@ def test_factory_with_locals_get_annotations():
     assert annotations["return"] is Cat
 
 
+def test_factory_annotations_are_shared_by_bound_methods():
+    class Handler:
+        @inject()
+        def handle(self) -> "Cat":
+            ...
+
+    annotations = _get_factory_annotations_or_throw(Handler().handle)
+
+    assert annotations["return"] is Cat
+    assert _get_factory_annotations_or_throw(Handler().handle) is annotations
+    assert _get_factory_annotations_or_throw(Handler.handle) is annotations
+
+
+def test_factory_plain_annotations_are_not_evaluated(get_type_hints_calls):
+    @inject()
+    def plain_factory(cat: Cat) -> Cat:
+        return cat
+
+    @inject()
+    def forward_ref_factory(cat: "Cat") -> Cat:
+        return cat
+
+    @inject()
+    def optional_factory(cat: Cat = None) -> Cat:
+        return cat
+
+    assert _get_factory_annotations_or_throw(plain_factory) == {
+        "cat": Cat,
+        "return": Cat,
+    }
+    assert _get_factory_annotations_or_throw(forward_ref_factory)["cat"] is Cat
+    _get_factory_annotations_or_throw(optional_factory)
+
+    assert plain_factory not in get_type_hints_calls
+    assert forward_ref_factory in get_type_hints_calls
+    assert optional_factory in get_type_hints_calls
+
+
 def test_deps_github_scenario():
     """
     CLAHandler
@@ -2683,6 +3089,83 @@ def test_singleton_register_order_first():
     assert bar.foo is bar2.foo is foo
 
 
+def test_container_provider_is_extended_with_new_registrations():
+    class Bar:
+        foo: Foo
+
+    container = Container()
+    container._add_exact_singleton(Foo)
+
+    foo = container.resolve(Foo)
+    provider = container.provider
+
+    container.register(Bar)
+
+    bar = container.resolve(Bar)
+
+    assert container.provider is not provider
+    assert bar.foo is foo
+    assert container.resolve(Foo) is foo
+    assert container.resolve("bar") is not bar
+    assert Bar not in provider
+
+
+def test_container_provider_extension_keeps_registration_order_for_names():
+    container = Container(strict=True)
+    container._add_exact_singleton(Foo)
+    container.provider
+
+    types = [type("Dup", (), {}) for _ in range(20)]
+    for _type in types:
+        container.register(_type)
+
+    assert isinstance(container.resolve("Dup"), types[-1])
+
+
+def test_container_provider_is_rebuilt_when_aliases_change():
+    container = Container()
+    container._add_exact_singleton(Foo)
+
+    assert container.provider.get("some_foo", default=None) is None
+
+    container.set_alias("some_foo", Foo)
+
+    assert isinstance(container.resolve("some_foo"), Foo)
+
+
+def test_container_provider_extension_ignores_services_set_on_provider():
+    class Bar:
+        pass
+
+    container = Container()
+    container._add_exact_singleton(Foo)
+
+    bar = Bar()
+    container.provider.set(Bar, bar)
+
+    container.register(Bar)
+
+    assert isinstance(container.resolve(Bar), Bar)
+    assert container.resolve(Bar) is not bar
+
+
+def test_container_provider_rebuild_keeps_activated_singletons():
+    container = Container()
+    container.add_singleton(Foo)
+
+    foo = container.resolve(Foo)
+
+    # makes the "foo" alias ambiguous, which rebuilds the provider
+    container.register(type("Foo", (), {}))
+
+    assert container.resolve(Foo) is foo
+
+    container.set_alias("some_foo", Foo)
+
+    assert container.resolve(Foo) is foo
+    assert container.resolve("some_foo") is foo
+
+
 def test_ignore_class_variable_if_already_initialized():
     """
     if a class variable is already initialized, it should not be overridden by